@@ -1,7 +1,5 @@
 """Pega When Rule Agent - Convert natural language to Pega When Rules for HSBC RBWM."""
 
-from pega_agent.models import WhenRule, Condition, ConditionGroup, LogicalOperator, Comparator
-from pega_agent.agent import pega_when_rule_agent
 from pega_agent.hsbc_domain import (
     CAR_TABLE,
     AAR_TABLE,
@@ -11,7 +9,31 @@ from pega_agent.hsbc_domain import (
     suggest_data_source,
 )
 
-root_agent = pega_when_rule_agent
+
+_MODEL_NAMES = ("WhenRule", "Condition", "ConditionGroup", "LogicalOperator", "Comparator")
+
+
+def __getattr__(name):
+    # The models import pydantic, so load them on first access; importing a
+    # submodule such as pega_agent.main or pega_agent.hsbc_domain stays light.
+    if name in _MODEL_NAMES:
+        from pega_agent import models
+        value = globals()[name] = getattr(models, name)
+        return value
+    # The agent pulls in google.adk and builds its instruction, so only load it
+    # on first access; data-only users of the models never pay for it.
+    if name in ("root_agent", "pega_when_rule_agent"):
+        from pega_agent.agent import pega_when_rule_agent
+        globals()["root_agent"] = globals()["pega_when_rule_agent"] = pega_when_rule_agent
+        return pega_when_rule_agent
+    # ADK's agent loader prefers "app" over "root_agent", so `adk web` picks up
+    # the App and its context cache config.
+    if name in ("app", "pega_when_rule_app"):
+        from pega_agent.agent import pega_when_rule_app
+        globals()["app"] = globals()["pega_when_rule_app"] = pega_when_rule_app
+        return pega_when_rule_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     # Models
@@ -23,6 +45,8 @@ __all__ = [
     # Agent
     "root_agent",
     "pega_when_rule_agent",
+    "app",
+    "pega_when_rule_app",
     # HSBC Domain
     "CAR_TABLE",
     "AAR_TABLE",
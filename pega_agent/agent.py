@@ -1,8 +1,18 @@
 """Pega When Rule Agent using Google Agent Development Kit."""
 
 import json
+import re
+from functools import cache, lru_cache
 from typing import Optional
 from google.adk.agents import Agent
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.apps import App
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 from pega_agent.models import (
     WhenRule,
@@ -25,6 +35,42 @@ from pega_agent.hsbc_domain import (
 )
 
 
+_COMPARATOR_BY_VALUE: dict[str, Comparator] = {c.value: c for c in Comparator}
+
+_LOGICAL_OP_BY_STR: dict[str, LogicalOperator] = {op.value: op for op in LogicalOperator}
+
+_FUNC_RE = re.compile(r'@\w+\([^)]*\)')
+
+
+# Conditions are immutable, so examples share one instance per distinct condition
+def _prop(
+    property_reference: str,
+    comparator: Comparator,
+    compare_value: Optional[str] = None,
+    apply_trim: bool = True,
+) -> Condition:
+    return Condition(
+        property_reference=property_reference,
+        comparator=comparator,
+        compare_value=compare_value,
+        apply_trim=apply_trim,
+    )
+
+
+@cache
+def _rule_ref(rule_name: str, evaluates_to: bool = True) -> Condition:
+    return Condition(
+        condition_type=ConditionType.RULE_REFERENCE,
+        referenced_rule=rule_name,
+        rule_evaluates_to=evaluates_to,
+    )
+
+
+_MORE_THAN_1_BOND_MATURING = _prop(
+    "BOND_CERT_DEP_MAT_NXT_2_DY_CNT", Comparator.GREATER_THAN, "1", apply_trim=False
+)
+
+
 # Real-world example When Rules based on actual HSBC campaigns
 EXAMPLE_WHEN_RULES = [
     # =========================================================================
@@ -40,12 +86,12 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="IsCustomersHoldingMPF"),
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="IsMMOCustomers"),
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="IsValidAccountAcclLevel"),
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="IsValidAccountCusLevel"),
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="NonCreditCampaigns"),
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="IsHKID"),
+                        _rule_ref("IsCustomersHoldingMPF"),
+                        _rule_ref("IsMMOCustomers"),
+                        _rule_ref("IsValidAccountAcclLevel"),
+                        _rule_ref("IsValidAccountCusLevel"),
+                        _rule_ref("NonCreditCampaigns"),
+                        _rule_ref("IsHKID"),
                     ],
                     operator=LogicalOperator.OR
                 )
@@ -61,33 +107,11 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(
-                            property_reference="CUST_CTRY_RELN_CDE10",
-                            comparator=Comparator.EQUALS,
-                            compare_value="USP"
-                        ),
-                        Condition(
-                            property_reference="CUST_SUPRS_CDE36",
-                            comparator=Comparator.EQUALS,
-                            compare_value="F_SANT"
-                        ),
-                        Condition(
-                            property_reference="AGE_NUM",
-                            comparator=Comparator.LESS_THAN,
-                            compare_value="18",
-                            apply_trim=False
-                        ),
-                        Condition(
-                            property_reference="CUST_SUPRS_CDE2",
-                            comparator=Comparator.EQUALS,
-                            compare_value="CPEXCL"
-                        ),
-                        Condition(
-                            property_reference="AGE_NUM",
-                            comparator=Comparator.GREATER_THAN,
-                            compare_value="65",
-                            apply_trim=False
-                        ),
+                        _prop("CUST_CTRY_RELN_CDE10", Comparator.EQUALS, "USP"),
+                        _prop("CUST_SUPRS_CDE36", Comparator.EQUALS, "F_SANT"),
+                        _prop("AGE_NUM", Comparator.LESS_THAN, "18", apply_trim=False),
+                        _prop("CUST_SUPRS_CDE2", Comparator.EQUALS, "CPEXCL"),
+                        _prop("AGE_NUM", Comparator.GREATER_THAN, "65", apply_trim=False),
                     ],
                     operator=LogicalOperator.OR
                 )
@@ -106,19 +130,10 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(
-                            property_reference="CUST_CTRY_RELN_CDE8",
-                            comparator=Comparator.NOT_EQUALS,
-                            compare_value="NRHK"
-                        ),
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="IsValidStaticCode"),
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="IsCustRiskValueIn1to5"),
-                        Condition(
-                            property_reference="BOND_CERT_DEP_MAT_NXT_2_DY_CNT",
-                            comparator=Comparator.GREATER_THAN,
-                            compare_value="1",
-                            apply_trim=False
-                        ),
+                        _prop("CUST_CTRY_RELN_CDE8", Comparator.NOT_EQUALS, "NRHK"),
+                        _rule_ref("IsValidStaticCode"),
+                        _rule_ref("IsCustRiskValueIn1to5"),
+                        _MORE_THAN_1_BOND_MATURING,
                     ],
                     operator=LogicalOperator.AND
                 )
@@ -134,12 +149,7 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(
-                            property_reference="BOND_CERT_DEP_MAT_NXT_2_DY_CNT",
-                            comparator=Comparator.GREATER_THAN,
-                            compare_value="0",
-                            apply_trim=False
-                        ),
+                        _prop("BOND_CERT_DEP_MAT_NXT_2_DY_CNT", Comparator.GREATER_THAN, "0", apply_trim=False),
                     ],
                     operator=LogicalOperator.AND
                 )
@@ -155,11 +165,7 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(
-                            property_reference="CUST_SUPRS_CDE18",
-                            comparator=Comparator.NOT_EQUALS,
-                            compare_value="NOMK8K"
-                        ),
+                        _prop("CUST_SUPRS_CDE18", Comparator.NOT_EQUALS, "NOMK8K"),
                     ],
                     operator=LogicalOperator.AND
                 )
@@ -178,18 +184,8 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(
-                            property_reference="CUST_RISK_VAL",
-                            comparator=Comparator.GREATER_THAN_OR_EQUAL,
-                            compare_value="1",
-                            apply_trim=False
-                        ),
-                        Condition(
-                            property_reference="CUST_RISK_VAL",
-                            comparator=Comparator.LESS_THAN_OR_EQUAL,
-                            compare_value="5",
-                            apply_trim=False
-                        ),
+                        _prop("CUST_RISK_VAL", Comparator.GREATER_THAN_OR_EQUAL, "1", apply_trim=False),
+                        _prop("CUST_RISK_VAL", Comparator.LESS_THAN_OR_EQUAL, "5", apply_trim=False),
                     ],
                     operator=LogicalOperator.AND
                 )
@@ -205,17 +201,8 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(
-                            property_reference="INV_ACCT_FLG",
-                            comparator=Comparator.IS_TRUE,
-                            apply_trim=False
-                        ),
-                        Condition(
-                            property_reference="BOND_HOLDING_CNT",
-                            comparator=Comparator.GREATER_THAN,
-                            compare_value="0",
-                            apply_trim=False
-                        ),
+                        _prop("INV_ACCT_FLG", Comparator.IS_TRUE, apply_trim=False),
+                        _prop("BOND_HOLDING_CNT", Comparator.GREATER_THAN, "0", apply_trim=False),
                     ],
                     operator=LogicalOperator.AND
                 )
@@ -235,13 +222,8 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(condition_type=ConditionType.RULE_REFERENCE, referenced_rule="IsCustRiskValueIn1to5"),
-                        Condition(
-                            property_reference="BOND_CERT_DEP_MAT_NXT_2_DY_CNT",
-                            comparator=Comparator.GREATER_THAN,
-                            compare_value="1",
-                            apply_trim=False
-                        ),
+                        _rule_ref("IsCustRiskValueIn1to5"),
+                        _MORE_THAN_1_BOND_MATURING,
                     ],
                     operator=LogicalOperator.AND
                 )
@@ -258,17 +240,8 @@ EXAMPLE_WHEN_RULES = [
             condition_groups=[
                 ConditionGroup(
                     conditions=[
-                        Condition(
-                            condition_type=ConditionType.RULE_REFERENCE,
-                            referenced_rule="IsCustRiskValueIn1to5",
-                            rule_evaluates_to=False
-                        ),
-                        Condition(
-                            property_reference="BOND_CERT_DEP_MAT_NXT_2_DY_CNT",
-                            comparator=Comparator.EQUALS,
-                            compare_value="1",
-                            apply_trim=False
-                        ),
+                        _rule_ref("IsCustRiskValueIn1to5", evaluates_to=False),
+                        _prop("BOND_CERT_DEP_MAT_NXT_2_DY_CNT", Comparator.EQUALS, "1", apply_trim=False),
                     ],
                     operator=LogicalOperator.AND
                 )
@@ -277,6 +250,32 @@ EXAMPLE_WHEN_RULES = [
     },
 ]
 
+# Example rules never change, so render each expression once and keep it on
+# the example entry alongside its WhenRule
+for _example, _expression in zip(
+    EXAMPLE_WHEN_RULES,
+    WhenRule.to_expression_many([ex["output"] for ex in EXAMPLE_WHEN_RULES]),
+):
+    _example["expression"] = _expression
+del _example, _expression
+
+# Plain-dict projections of the examples; the prompt builder and
+# get_example_rules() only read these and never walk the WhenRule trees.
+_EXAMPLE_RULES_CACHED = tuple(
+    {
+        "natural_language": ex["input"],
+        "expression": ex["expression"],
+        "rule_name": ex["output"].rule_name,
+        "applies_to": ex["output"].applies_to,
+        "campaign_id": ex["output"].campaign_id,
+    }
+    for ex in EXAMPLE_WHEN_RULES
+)
+
+# ADK serializes tool results to JSON without mutating them, so every call can
+# return the same response dict
+_EXAMPLE_RULES_RESULT = {"examples": list(_EXAMPLE_RULES_CACHED)}
+
 
 def create_when_rule(
     rule_name: str,
@@ -315,8 +314,8 @@ def create_when_rule(
         Dictionary containing the When Rule in multiple formats (expression, XML, API dict)
     """
     try:
-        conditions_data = json.loads(conditions_json)
-    except json.JSONDecodeError as e:
+        conditions_data = _json_loads(conditions_json)
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses this
         return {"error": f"Invalid JSON in conditions: {e}"}
 
     # Build condition groups
@@ -334,31 +333,22 @@ def create_when_rule(
             else:
                 # Property comparison
                 comp_str = cond.get("comparator", "is equal to")
-                comparator = None
-                for c in Comparator:
-                    if c.value == comp_str:
-                        comparator = c
-                        break
-                if not comparator:
-                    comparator = Comparator.EQUALS
-
-                # Determine if we should apply trim (not for numeric comparisons)
-                apply_trim = comparator not in (
-                    Comparator.GREATER_THAN, Comparator.LESS_THAN,
-                    Comparator.GREATER_THAN_OR_EQUAL, Comparator.LESS_THAN_OR_EQUAL
-                )
+                comparator = _COMPARATOR_BY_VALUE.get(comp_str, Comparator.EQUALS)
 
                 conditions.append(Condition(
                     condition_type=ConditionType.PROPERTY_COMPARISON,
                     property_reference=cond.get("property", ""),
                     comparator=comparator,
                     compare_value=cond.get("value"),
-                    apply_trim=cond.get("apply_trim", apply_trim),
+                    # Numeric comparisons are never trimmed
+                    apply_trim=cond.get("apply_trim", not comparator.is_numeric),
                     compare_value_is_property=cond.get("is_property", False)
                 ))
 
         op_str = group_data.get("operator", "AND")
-        operator = LogicalOperator.AND if op_str == "AND" else LogicalOperator.OR
+        operator = _LOGICAL_OP_BY_STR.get(
+            op_str.upper() if isinstance(op_str, str) else "", LogicalOperator.AND
+        )
 
         condition_groups.append(ConditionGroup(
             conditions=conditions,
@@ -366,7 +356,9 @@ def create_when_rule(
         ))
 
     group_op_str = conditions_data.get("group_operator", "AND")
-    group_operator = LogicalOperator.AND if group_op_str == "AND" else LogicalOperator.OR
+    group_operator = _LOGICAL_OP_BY_STR.get(
+        group_op_str.upper() if isinstance(group_op_str, str) else "", LogicalOperator.AND
+    )
 
     # Create the When Rule
     when_rule = WhenRule(
@@ -416,9 +408,7 @@ def validate_when_rule(expression: str) -> dict:
     # Check for valid function syntax
     if "@" in expression:
         # Basic check for function calls
-        import re
-        func_pattern = r'@\w+\([^)]*\)'
-        if not re.search(func_pattern, expression):
+        if not _FUNC_RE.search(expression):
             errors.append("Invalid function syntax detected")
 
     return {
@@ -428,6 +418,26 @@ def validate_when_rule(expression: str) -> dict:
     }
 
 
+def validate_when_rules(expressions: list[str]) -> dict:
+    """Validate several Pega When Rule expressions in a single call.
+
+    Prefer this over repeated validate_when_rule calls when checking all the
+    rules of a campaign at once.
+
+    Args:
+        expressions: The When Rule expressions to validate
+
+    Returns:
+        Dictionary with per-expression validation results and an overall flag
+    """
+    results = [validate_when_rule(expression) for expression in expressions]
+    return {
+        "all_valid": all(r["valid"] for r in results),
+        "results": results
+    }
+
+
+@lru_cache(maxsize=1)
 def list_comparators() -> dict:
     """List all available Pega When Rule comparators.
 
@@ -448,16 +458,7 @@ def get_example_rules() -> dict:
     Returns:
         Dictionary with example natural language inputs and their When Rule outputs
     """
-    examples = []
-    for ex in EXAMPLE_WHEN_RULES:
-        examples.append({
-            "natural_language": ex["input"],
-            "expression": ex["output"].to_expression(),
-            "rule_name": ex["output"].rule_name,
-            "applies_to": ex["output"].applies_to,
-            "campaign_id": ex["output"].campaign_id
-        })
-    return {"examples": examples}
+    return _EXAMPLE_RULES_RESULT
 
 
 def get_data_sources() -> dict:
@@ -535,18 +536,28 @@ def get_campaign_template(campaign_id: str, campaign_type: str = "bond_maturity"
     return get_campaign_rule_template(campaign_id, campaign_type)
 
 
-# Build the instruction with HSBC domain knowledge and real examples
-def _build_instruction() -> str:
-    examples_text = ""
-    for ex in EXAMPLE_WHEN_RULES[:6]:  # Include key examples
-        examples_text += f"""
+_EXCLUSION_LINES = "\n".join(
+    f"- {name}: {desc}" for name, desc in STANDARD_EXCLUSION_RULES[:8]
+)
+
+
+# Build the instruction with HSBC domain knowledge and real examples.
+# Everything here is static, so the text is identical on every call and
+# request; keep per-request details out of it so provider-side prefix caches
+# keep hitting.
+@cache
+def _build_static_instruction() -> str:
+    parts = []
+    for ex in _EXAMPLE_RULES_CACHED[:6]:  # Include key examples
+        parts.append(f"""
 Example:
-  Input: "{ex["input"]}"
+  Input: "{ex["natural_language"]}"
   Output:
-    - rule_name: {ex["output"].rule_name}
-    - applies_to: {ex["output"].applies_to}
-    - expression: {ex["output"].to_expression()}
-"""
+    - rule_name: {ex["rule_name"]}
+    - applies_to: {ex["applies_to"]}
+    - expression: {ex["expression"]}
+""")
+    examples_text = "".join(parts)
 
     return f"""You are a Pega Platform expert assistant for HSBC Retail Banking and Wealth Management (RBWM).
 You convert natural language campaign targeting criteria into Pega When Rules.
@@ -583,7 +594,7 @@ Use Pega function syntax for expressions:
 - Group with parentheses: `(cond1 && cond2) || (cond3 && cond4)`
 
 ## Standard Exclusion Rules (can be referenced)
-{chr(10).join([f"- {name}: {desc}" for name, desc in list(STANDARD_EXCLUSION_RULES.items())[:8]])}
+{_EXCLUSION_LINES}
 
 ## Campaign Rule Structure
 1. **OtherStandardExclusion_[ID]**: Combines standard exclusion rules with OR logic
@@ -605,15 +616,21 @@ Use get_exclusion_rules() to see standard exclusion rules you can reference.
 """
 
 
+INSTRUCTION_TEXT = _build_static_instruction()
+
+
 # Create the main agent
 pega_when_rule_agent = Agent(
     name="pega_when_rule_agent",
     model="gemini-3-flash-preview",
     description="Converts natural language campaign criteria into Pega When Rules for HSBC RBWM",
-    instruction=_build_instruction(),
+    # Sent verbatim as the leading system instruction, without the per-turn
+    # placeholder substitution applied to `instruction`
+    static_instruction=INSTRUCTION_TEXT,
     tools=[
         create_when_rule,
         validate_when_rule,
+        validate_when_rules,
         list_comparators,
         get_example_rules,
         get_data_sources,
@@ -623,3 +640,12 @@ pega_when_rule_agent = Agent(
         get_campaign_template,
     ]
 )
+
+
+# The instruction and tool declarations form a large prefix that is identical
+# on every turn; let Gemini context caching serve it instead of resending it.
+pega_when_rule_app = App(
+    name="pega-when-rule-agent",
+    root_agent=pega_when_rule_agent,
+    context_cache_config=ContextCacheConfig(ttl_seconds=1800),
+)
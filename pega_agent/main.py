@@ -3,22 +3,95 @@
 import asyncio
 import os
 import sys
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-# Load .env file before importing google modules
-from dotenv import load_dotenv
-env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(env_path)
+# Load .env file before importing google modules. Child processes inherit the
+# loaded environment, so the marker lets them skip parsing the file again.
+ENV_PATH = Path(__file__).parent.parent / ".env"
+if "_PEGA_ENV_LOADED" not in os.environ:
+    from dotenv import load_dotenv
 
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+    load_dotenv(ENV_PATH)
+    os.environ["_PEGA_ENV_LOADED"] = "1"
 
-from pega_agent.agent import pega_when_rule_agent
+from pega_agent.semantic_cache import SemanticCache
 
+# ADK, google-genai and the agent itself are imported where first needed so
+# that starting the CLI does not pay for them up front.
+if TYPE_CHECKING:
+    from google import genai
+    from google.adk.runners import Runner
+    from google.genai import types
 
-def create_user_message(text: str) -> types.Content:
+EMBEDDING_MODEL = "gemini-embedding-001"
+
+DEFAULT_SEMANTIC_CACHE_PATH = Path.home() / ".cache" / "pega-agent" / "semantic_cache.json"
+
+
+def _semantic_cache_enabled() -> bool:
+    return os.getenv("PEGA_SEMANTIC_CACHE", "FALSE").upper() == "TRUE"
+
+
+@cache
+def _semantic_cache() -> SemanticCache:
+    """Return the on-disk semantic cache shared by single-query runs."""
+    path = os.getenv("PEGA_SEMANTIC_CACHE_PATH")
+    return SemanticCache(
+        threshold=0.92,
+        maxsize=512,
+        path=Path(path) if path else DEFAULT_SEMANTIC_CACHE_PATH,
+    )
+
+
+@cache
+def _genai_client() -> "genai.Client":
+    from google import genai
+
+    return genai.Client()
+
+
+async def _embed_query(text: str) -> list[float]:
+    """Embed a user query for semantic cache lookups."""
+    result = await _genai_client().aio.models.embed_content(
+        model=EMBEDDING_MODEL,
+        contents=text,
+    )
+    return result.embeddings[0].values
+
+
+async def _cache_lookup(query: str) -> tuple[Optional[list[float]], Optional[str]]:
+    """Return the query embedding and any cached response for it.
+
+    The cache is only an optimization, so a failed embedding call returns
+    (None, None) and the query goes to the agent as usual.
+    """
+    try:
+        embedding = await _embed_query(query)
+    except Exception:
+        return None, None
+    return embedding, _semantic_cache().get(query, embedding)
+
+
+@cache
+def _get_runner() -> "Runner":
+    """Return the process-wide runner, building it on first use."""
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
+    from pega_agent.agent import pega_when_rule_app
+
+    return Runner(
+        app=pega_when_rule_app,
+        session_service=InMemorySessionService(),
+    )
+
+
+def create_user_message(text: str) -> "types.Content":
     """Create a user message Content object."""
+    from google.genai import types
+
     return types.Content(
         role="user",
         parts=[types.Part(text=text)]
@@ -27,15 +100,9 @@ def create_user_message(text: str) -> types.Content:
 
 async def run_interactive():
     """Run the agent in interactive mode."""
-    session_service = InMemorySessionService()
-    runner = Runner(
-        agent=pega_when_rule_agent,
-        app_name="pega-when-rule-agent",
-        session_service=session_service,
-    )
-
-    session = await session_service.create_session(
-        app_name="pega-when-rule-agent",
+    runner = _get_runner()
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name,
         user_id="user",
     )
 
@@ -50,6 +117,8 @@ async def run_interactive():
 
     while True:
         try:
+            # Nothing else runs on the loop between turns, so a blocking read
+            # is fine and keeps Ctrl-C raising KeyboardInterrupt here.
             user_input = input("You: ").strip()
         except (EOFError, KeyboardInterrupt):
             print("\nGoodbye!")
@@ -74,61 +143,104 @@ async def run_interactive():
 
         # Run the agent
         user_message = create_user_message(user_input)
+        # Write response chunks unflushed and flush once at the end of the turn;
+        # the first chunk gets the "Agent:" prefix, later ones start a new line
+        separator = "\nAgent: "
         async for event in runner.run_async(
             session_id=session.id,
             user_id="user",
             new_message=user_message,
         ):
-            if hasattr(event, "content") and event.content:
-                if hasattr(event.content, "parts"):
-                    for part in event.content.parts:
-                        if hasattr(part, "text") and part.text:
-                            print(f"\nAgent: {part.text}")
+            content = event.content
+            if content is None or not content.parts:
+                continue
+            for part in content.parts:
+                text = part.text
+                if text:
+                    sys.stdout.write(separator)
+                    sys.stdout.write(text)
+                    separator = "\n"
 
-        print()
+        sys.stdout.write("\n\n" if separator == "\n" else "\n")
+        sys.stdout.flush()
 
 
 async def run_single_query(query: str):
-    """Run a single query and return the result."""
-    session_service = InMemorySessionService()
-    runner = Runner(
-        agent=pega_when_rule_agent,
-        app_name="pega-when-rule-agent",
-        session_service=session_service,
-    )
-
-    session = await session_service.create_session(
-        app_name="pega-when-rule-agent",
+    """Run a single query and return the result.
+
+    With PEGA_SEMANTIC_CACHE=TRUE, a query similar enough to one answered by
+    an earlier run returns that answer without calling the agent. Each query
+    starts a fresh session, so the cached answer never depends on earlier
+    turns. Answers are kept on disk (PEGA_SEMANTIC_CACHE_PATH, by default
+    ~/.cache/pega-agent/semantic_cache.json).
+    """
+    embedding = None
+    if _semantic_cache_enabled():
+        embedding, cached = await _cache_lookup(query)
+        if cached is not None:
+            return cached
+
+    runner = _get_runner()
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name,
         user_id="user",
     )
 
-    result_text = ""
+    chunks = []
     user_message = create_user_message(query)
 
-    async for event in runner.run_async(
-        session_id=session.id,
-        user_id="user",
-        new_message=user_message,
-    ):
-        if hasattr(event, "content") and event.content:
-            if hasattr(event.content, "parts"):
-                for part in event.content.parts:
-                    if hasattr(part, "text") and part.text:
-                        result_text += part.text
+    # The session service lives as long as the process, so drop the one-off
+    # session afterwards instead of keeping its event history around
+    try:
+        async for event in runner.run_async(
+            session_id=session.id,
+            user_id="user",
+            new_message=user_message,
+        ):
+            content = event.content
+            if content is None or not content.parts:
+                continue
+            for part in content.parts:
+                text = part.text
+                if text:
+                    chunks.append(text)
+    finally:
+        await runner.session_service.delete_session(
+            app_name=runner.app_name,
+            user_id="user",
+            session_id=session.id,
+        )
+
+    result_text = "".join(chunks)
+
+    if embedding is not None and result_text:
+        try:
+            _semantic_cache().put(query, embedding, result_text)
+        except OSError:
+            pass  # An unwritable cache file must not fail the query
 
     return result_text
 
 
-def main():
-    """Main entry point."""
+async def main_async():
+    """Dispatch to single query or interactive mode on one event loop."""
     if len(sys.argv) > 1:
         # Single query mode
         query = " ".join(sys.argv[1:])
-        result = asyncio.run(run_single_query(query))
-        print(result)
+        print(await run_single_query(query))
     else:
         # Interactive mode
-        asyncio.run(run_interactive())
+        await run_interactive()
+
+
+def main():
+    """Main entry point."""
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main_async())
+    else:
+        uvloop.run(main_async())
 
 
 if __name__ == "__main__":
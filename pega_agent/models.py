@@ -1,8 +1,10 @@
 """Pega When Rule data models."""
 
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, Field
+from operator import ge, gt, le, lt
+from typing import Any, Callable, Mapping, Optional
+from xml.sax.saxutils import escape as _xml_escape
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Comparator(str, Enum):
@@ -24,6 +26,19 @@ class Comparator(str, Enum):
     IS_IN = "is in"
     IS_NOT_IN = "is not in"
 
+    @property
+    def is_numeric(self) -> bool:
+        """True for ordering comparators, which never trim the property."""
+        return self in NUMERIC_COMPARATORS
+
+
+NUMERIC_COMPARATORS: frozenset[Comparator] = frozenset({
+    Comparator.GREATER_THAN,
+    Comparator.GREATER_THAN_OR_EQUAL,
+    Comparator.LESS_THAN,
+    Comparator.LESS_THAN_OR_EQUAL,
+})
+
 
 class PegaFunction(str, Enum):
     """Pega built-in functions for expression syntax."""
@@ -54,12 +69,78 @@ class PegaFunction(str, Enum):
     IS_IN_PAGE_LIST = "@IsInPageListWhen"
 
 
+# Pega function used for each comparator when rendering function syntax
+_COMPARATOR_TO_FUNC: dict[Comparator, PegaFunction] = {
+    Comparator.EQUALS: PegaFunction.EQUALS_IGNORE_CASE,
+    Comparator.NOT_EQUALS: PegaFunction.NOT_EQUALS_IGNORE_CASE,
+    Comparator.GREATER_THAN: PegaFunction.GREATER_THAN,
+    Comparator.GREATER_THAN_OR_EQUAL: PegaFunction.GREATER_THAN_OR_EQUAL,
+    Comparator.LESS_THAN: PegaFunction.LESS_THAN,
+    Comparator.LESS_THAN_OR_EQUAL: PegaFunction.LESS_THAN_OR_EQUAL,
+    Comparator.CONTAINS: PegaFunction.CONTAINS,
+    Comparator.STARTS_WITH: PegaFunction.STARTS_WITH,
+    Comparator.ENDS_WITH: PegaFunction.ENDS_WITH,
+    Comparator.IS_TRUE: PegaFunction.IS_TRUE,
+    Comparator.IS_FALSE: PegaFunction.IS_FALSE,
+    Comparator.IS_BLANK: PegaFunction.IS_BLANK,
+    Comparator.IS_NOT_BLANK: PegaFunction.IS_NOT_BLANK,
+}
+
+# Comparators and functions that take no compare value
+_UNARY_COMPARATORS = frozenset({
+    Comparator.IS_TRUE,
+    Comparator.IS_FALSE,
+    Comparator.IS_BLANK,
+    Comparator.IS_NOT_BLANK,
+})
+_UNARY_FUNCS = frozenset({
+    PegaFunction.IS_TRUE,
+    PegaFunction.IS_FALSE,
+    PegaFunction.IS_BLANK,
+    PegaFunction.IS_NOT_BLANK,
+})
+
+# Numeric functions never trim the property
+_NUMERIC_FUNCS = frozenset({
+    PegaFunction.GREATER_THAN,
+    PegaFunction.GREATER_THAN_OR_EQUAL,
+    PegaFunction.LESS_THAN,
+    PegaFunction.LESS_THAN_OR_EQUAL,
+})
+
+# Function names resolved once; Enum.value is a descriptor call on every access
+_FUNC_NAME: dict[PegaFunction, str] = {func: func.value for func in PegaFunction}
+
+
+def _is_numeric_literal(value: str) -> bool:
+    """True for digits with optional '.' and '-' (e.g. 18, -1.5, 2024-01-01)."""
+    # Two replace() calls and isdigit() benchmark faster than a regex match
+    return value.replace('.', '').replace('-', '').isdigit()
+
+
+def _maybe_quote(value: str) -> str:
+    """Quote a compare value unless it is numeric or already quoted."""
+    if value.startswith('"') or _is_numeric_literal(value):
+        return value
+    return f'"{value}"'
+
+
 class LogicalOperator(str, Enum):
     """Logical operators to combine conditions."""
     AND = "AND"
     OR = "OR"
 
 
+# Expression symbol for each logical operator, and its escaped XML form
+_OP_SYMBOL: dict[LogicalOperator, str] = {
+    LogicalOperator.AND: "&&",
+    LogicalOperator.OR: "||",
+}
+_XML_OP_SYMBOL: dict[LogicalOperator, str] = {
+    op: _xml_escape(symbol) for op, symbol in _OP_SYMBOL.items()
+}
+
+
 class ConditionType(str, Enum):
     """Type of condition."""
     PROPERTY_COMPARISON = "property"
@@ -74,7 +155,11 @@ class Condition(BaseModel):
     1. Property comparison: AGE_NUM > 18, CUST_SEGMENT == "Premier"
     2. Rule reference: {Rule IsValidRPQ evaluates to true}
     3. Function call: @equalsIgnoreCase(@trim(PROP), "value")
+
+    Conditions are immutable so identical ones can be shared between rules.
     """
+    model_config = ConfigDict(frozen=True)
+
     condition_type: ConditionType = Field(
         default=ConditionType.PROPERTY_COMPARISON,
         description="Type of condition"
@@ -162,26 +247,63 @@ class WhenRule(BaseModel):
         Args:
             use_pega_functions: If True, use @function() syntax. If False, use simple syntax.
         """
-        group_expressions = []
-        op_symbol = "&&" if self.group_operator == LogicalOperator.AND else "||"
-
-        for group in self.condition_groups:
-            conditions_str = []
-            for cond in group.conditions:
-                expr = self._condition_to_expr(cond, use_pega_functions)
-                conditions_str.append(expr)
+        groups = self.condition_groups
+        # Most rules are a single group, which needs no group-level join
+        if len(groups) == 1:
+            return self._group_to_expr(groups[0], use_pega_functions)
+
+        op_symbol = _OP_SYMBOL[self.group_operator]
+        group_expressions = [
+            self._group_to_expr(group, use_pega_functions) for group in groups
+        ]
+        return f" {op_symbol} ".join(group_expressions)
 
-            group_op = "&&" if group.operator == LogicalOperator.AND else "||"
+    @staticmethod
+    def to_expression_many(rules: list["WhenRule"], use_pega_functions: bool = True) -> list[str]:
+        """Convert several When Rules to Pega expression strings.
 
-            if len(conditions_str) == 1:
-                group_expressions.append(conditions_str[0])
+        Condition instances shared between the rules (e.g. the same rule
+        reference in many exclusion rules) are rendered only once.
+        """
+        rendered: dict[int, str] = {}
+        expressions = []
+        for rule in rules:
+            group_expressions = [
+                rule._group_to_expr(group, use_pega_functions, rendered)
+                for group in rule.condition_groups
+            ]
+            if len(group_expressions) == 1:
+                expressions.append(group_expressions[0])
             else:
-                joined = f" {group_op} ".join(conditions_str)
-                group_expressions.append(f"({joined})")
-
-        if len(group_expressions) == 1:
-            return group_expressions[0]
-        return f" {op_symbol} ".join(group_expressions)
+                op_symbol = _OP_SYMBOL[rule.group_operator]
+                expressions.append(f" {op_symbol} ".join(group_expressions))
+        return expressions
+
+    def _group_to_expr(
+        self,
+        group: ConditionGroup,
+        use_pega_functions: bool,
+        rendered: Optional[dict[int, str]] = None,
+    ) -> str:
+        """Convert a condition group to expression string."""
+        conditions = group.conditions
+        if rendered is None:
+            if len(conditions) == 1:
+                return self._condition_to_expr(conditions[0], use_pega_functions)
+            exprs = [self._condition_to_expr(cond, use_pega_functions) for cond in conditions]
+        else:
+            exprs = []
+            for cond in conditions:
+                expr = rendered.get(id(cond))
+                if expr is None:
+                    expr = rendered[id(cond)] = self._condition_to_expr(cond, use_pega_functions)
+                exprs.append(expr)
+            if len(exprs) == 1:
+                return exprs[0]
+
+        group_op = _OP_SYMBOL[group.operator]
+        joined = f" {group_op} ".join(exprs)
+        return f"({joined})"
 
     def _condition_to_expr(self, cond: Condition, use_pega_functions: bool) -> str:
         """Convert a single condition to expression string."""
@@ -203,14 +325,12 @@ class WhenRule(BaseModel):
         # Simple syntax
         if cond.comparator:
             comp = cond.comparator.value
-            if cond.comparator in (Comparator.IS_TRUE, Comparator.IS_FALSE,
-                                   Comparator.IS_BLANK, Comparator.IS_NOT_BLANK):
+            if cond.comparator in _UNARY_COMPARATORS:
                 return f"{prop} {comp}"
 
             val = cond.compare_value
             if not cond.compare_value_is_property and isinstance(val, str):
-                if not val.startswith('"') and not val.replace('.', '').replace('-', '').isdigit():
-                    val = f'"{val}"'
+                val = _maybe_quote(val)
             return f"{prop} {comp} {val}"
 
         return prop
@@ -220,20 +340,17 @@ class WhenRule(BaseModel):
         prop = cond.property_reference or ""
         func = cond.pega_function
 
-        if cond.apply_trim and func not in (PegaFunction.GREATER_THAN, PegaFunction.LESS_THAN,
-                                             PegaFunction.GREATER_THAN_OR_EQUAL, PegaFunction.LESS_THAN_OR_EQUAL):
+        if cond.apply_trim and func not in _NUMERIC_FUNCS:
             prop = f"@trim({prop})"
 
-        if func in (PegaFunction.IS_TRUE, PegaFunction.IS_FALSE,
-                    PegaFunction.IS_BLANK, PegaFunction.IS_NOT_BLANK):
-            return f"{func.value}({prop})"
+        if func in _UNARY_FUNCS:
+            return f"{_FUNC_NAME[func]}({prop})"
 
         val = cond.compare_value or ""
-        if not cond.compare_value_is_property and not val.startswith('"'):
-            if not val.replace('.', '').replace('-', '').isdigit():
-                val = f'"{val}"'
+        if not cond.compare_value_is_property:
+            val = _maybe_quote(val)
 
-        return f"{func.value}({prop}, {val})"
+        return f"{_FUNC_NAME[func]}({prop}, {val})"
 
     def _build_function_expr_from_comparator(self, cond: Condition) -> str:
         """Build Pega function expression from simple comparator."""
@@ -241,96 +358,97 @@ class WhenRule(BaseModel):
         comp = cond.comparator
         val = cond.compare_value or ""
 
-        # Map comparators to functions
-        func_map = {
-            Comparator.EQUALS: PegaFunction.EQUALS_IGNORE_CASE,
-            Comparator.NOT_EQUALS: PegaFunction.NOT_EQUALS_IGNORE_CASE,
-            Comparator.GREATER_THAN: PegaFunction.GREATER_THAN,
-            Comparator.GREATER_THAN_OR_EQUAL: PegaFunction.GREATER_THAN_OR_EQUAL,
-            Comparator.LESS_THAN: PegaFunction.LESS_THAN,
-            Comparator.LESS_THAN_OR_EQUAL: PegaFunction.LESS_THAN_OR_EQUAL,
-            Comparator.CONTAINS: PegaFunction.CONTAINS,
-            Comparator.STARTS_WITH: PegaFunction.STARTS_WITH,
-            Comparator.ENDS_WITH: PegaFunction.ENDS_WITH,
-            Comparator.IS_TRUE: PegaFunction.IS_TRUE,
-            Comparator.IS_FALSE: PegaFunction.IS_FALSE,
-            Comparator.IS_BLANK: PegaFunction.IS_BLANK,
-            Comparator.IS_NOT_BLANK: PegaFunction.IS_NOT_BLANK,
-        }
-
-        func = func_map.get(comp)
+        func = _COMPARATOR_TO_FUNC.get(comp)
         if not func:
             # Fallback to simple comparison
             return f"({prop} == {val})"
 
         # Apply trim for string comparisons
-        is_numeric = comp in (Comparator.GREATER_THAN, Comparator.LESS_THAN,
-                              Comparator.GREATER_THAN_OR_EQUAL, Comparator.LESS_THAN_OR_EQUAL)
+        is_numeric = comp in NUMERIC_COMPARATORS
 
         if cond.apply_trim and not is_numeric:
             prop = f"@trim({prop})"
 
-        if func in (PegaFunction.IS_TRUE, PegaFunction.IS_FALSE,
-                    PegaFunction.IS_BLANK, PegaFunction.IS_NOT_BLANK):
-            return f"{func.value}({prop})"
+        if func in _UNARY_FUNCS:
+            return f"{_FUNC_NAME[func]}({prop})"
 
         # Quote string values for non-numeric comparisons
-        if not is_numeric and not val.startswith('"'):
-            if not val.replace('.', '').replace('-', '').isdigit():
-                val = f'"{val}"'
+        if not is_numeric:
+            val = _maybe_quote(val)
 
-        return f"{func.value}({prop}, {val})"
+        return f"{_FUNC_NAME[func]}({prop}, {val})"
 
     def to_pega_xml(self) -> str:
         """Generate Pega-compatible XML representation of the When Rule."""
-        conditions_xml = []
+        # Collect fragments and join once; every condition element starts
+        # with its own newline so no separator pass is needed.
+        parts = [f"""<?xml version="1.0" encoding="UTF-8"?>
+<pega:WhenRule xmlns:pega="http://www.pega.com/rules">
+  <ruleName>{_xml_escape(self.rule_name)}</ruleName>
+  <appliesTo>{_xml_escape(self.applies_to)}</appliesTo>
+  <description>{_xml_escape(self.description)}</description>
+  <campaignId>{_xml_escape(self.campaign_id or "")}</campaignId>
+  <conditions>"""]
+        append = parts.append
+        extend = parts.extend
+        esc = _xml_escape
+
+        group_operator_xml = (
+            f"\n    <groupOperator>{_XML_OP_SYMBOL[self.group_operator]}</groupOperator>"
+        )
+
+        # Operators go in front of every group and condition but the first
+        group_separator = ""
+        for group in self.condition_groups:
+            if group_separator:
+                append(group_separator)
+            group_separator = group_operator_xml
 
-        for group_idx, group in enumerate(self.condition_groups):
-            for cond_idx, cond in enumerate(group.conditions):
+            operator_xml = f"\n    <operator>{_XML_OP_SYMBOL[group.operator]}</operator>"
+            separator = ""
+            for cond in group.conditions:
                 if cond.condition_type == ConditionType.RULE_REFERENCE:
-                    condition_xml = f"""    <ruleReference>
-      <ruleName>{cond.referenced_rule}</ruleName>
-      <evaluatesTo>{str(cond.rule_evaluates_to).lower()}</evaluatesTo>
-    </ruleReference>"""
+                    extend((
+                        separator,
+                        "\n    <ruleReference>\n      <ruleName>",
+                        esc(str(cond.referenced_rule)),
+                        "</ruleName>\n      <evaluatesTo>",
+                        "true" if cond.rule_evaluates_to else "false",
+                        "</evaluatesTo>\n    </ruleReference>",
+                    ))
                 else:
-                    condition_xml = f"""    <condition>
-      <propertyRef>{cond.property_reference or ""}</propertyRef>
-      <comparator>{cond.comparator.value if cond.comparator else ""}</comparator>
-      <compareValue>{cond.compare_value or ""}</compareValue>
-      <compareValueIsProperty>{str(cond.compare_value_is_property).lower()}</compareValueIsProperty>
-    </condition>"""
-                conditions_xml.append(condition_xml)
-
-                if cond_idx < len(group.conditions) - 1:
-                    op = "&&" if group.operator == LogicalOperator.AND else "||"
-                    conditions_xml.append(f"    <operator>{op}</operator>")
-
-            if group_idx < len(self.condition_groups) - 1:
-                op = "&&" if self.group_operator == LogicalOperator.AND else "||"
-                conditions_xml.append(f"    <groupOperator>{op}</groupOperator>")
-
-        return f"""<?xml version="1.0" encoding="UTF-8"?>
-<pega:WhenRule xmlns:pega="http://www.pega.com/rules">
-  <ruleName>{self.rule_name}</ruleName>
-  <appliesTo>{self.applies_to}</appliesTo>
-  <description>{self.description}</description>
-  <campaignId>{self.campaign_id or ""}</campaignId>
-  <conditions>
-{chr(10).join(conditions_xml)}
-  </conditions>
-</pega:WhenRule>"""
+                    extend((
+                        separator,
+                        "\n    <condition>\n      <propertyRef>",
+                        esc(cond.property_reference or ""),
+                        "</propertyRef>\n      <comparator>",
+                        cond.comparator.value if cond.comparator else "",
+                        "</comparator>\n      <compareValue>",
+                        esc(cond.compare_value or ""),
+                        "</compareValue>\n      <compareValueIsProperty>",
+                        "true" if cond.compare_value_is_property else "false",
+                        "</compareValueIsProperty>\n    </condition>",
+                    ))
+                separator = operator_xml
+
+        if len(parts) == 1:
+            # Keep the empty line an empty <conditions> block has always had
+            append("\n")
+        append("\n  </conditions>\n</pega:WhenRule>")
+        return "".join(parts)
 
     def to_dict(self) -> dict:
         """Convert to dictionary format suitable for Pega REST API."""
         conditions_list = []
         for group in self.condition_groups:
+            op_symbol = _OP_SYMBOL[group.operator]
             for cond in group.conditions:
                 if cond.condition_type == ConditionType.RULE_REFERENCE:
                     conditions_list.append({
                         "pyConditionType": "rule",
                         "pyRuleName": cond.referenced_rule,
                         "pyEvaluatesTo": cond.rule_evaluates_to,
-                        "pyLogicalOperator": "&&" if group.operator == LogicalOperator.AND else "||"
+                        "pyLogicalOperator": op_symbol
                     })
                 else:
                     conditions_list.append({
@@ -339,7 +457,7 @@ class WhenRule(BaseModel):
                         "pyComparator": cond.comparator.value if cond.comparator else "",
                         "pyCompareValue": cond.compare_value or "",
                         "pyCompareValueIsProperty": cond.compare_value_is_property,
-                        "pyLogicalOperator": "&&" if group.operator == LogicalOperator.AND else "||"
+                        "pyLogicalOperator": op_symbol
                     })
 
         return {
@@ -350,3 +468,126 @@ class WhenRule(BaseModel):
             "pyCampaignId": self.campaign_id,
             "pyConditions": conditions_list
         }
+
+    def compile(self, rules: Optional[Mapping[str, "RulePredicate"]] = None) -> "RulePredicate":
+        """Compile the When Rule into a function that evaluates it for one record.
+
+        The condition tree is walked once here; the returned function maps a
+        record of property values (e.g. a CAR row) to True/False without
+        re-reading the model. Comparisons follow the Pega functions the rule
+        renders to: string matches ignore case, numeric comparators convert
+        both sides to numbers and never trim.
+
+        Args:
+            rules: Compiled When Rules by name, for rule references. Looked up
+                when the rule is evaluated, so it may be filled in afterwards.
+
+        Raises:
+            ValueError: If a condition has no evaluable comparison (e.g. "is in").
+        """
+        rules = {} if rules is None else rules
+        return _combine(
+            [
+                _combine([_compile_condition(cond, rules) for cond in group.conditions], group.operator)
+                for group in self.condition_groups
+            ],
+            self.group_operator,
+        )
+
+
+# =============================================================================
+# Rule evaluation (WhenRule.compile)
+# =============================================================================
+
+RulePredicate = Callable[[Mapping[str, Any]], bool]
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _numeric_test(compare: Callable[[float, float], bool]) -> Callable[[Any, Any], bool]:
+    def test(left: Any, right: Any) -> bool:
+        left, right = _number(left), _number(right)
+        return left is not None and right is not None and compare(left, right)
+    return test
+
+
+# (property value, compare value) -> result, for each evaluable Pega function
+_FUNC_TESTS: dict[PegaFunction, Callable[[Any, Any], bool]] = {
+    PegaFunction.EQUALS_IGNORE_CASE: lambda left, right: _text(left).casefold() == _text(right).casefold(),
+    PegaFunction.NOT_EQUALS_IGNORE_CASE: lambda left, right: _text(left).casefold() != _text(right).casefold(),
+    PegaFunction.CONTAINS: lambda left, right: _text(right).casefold() in _text(left).casefold(),
+    PegaFunction.STARTS_WITH: lambda left, right: _text(left).casefold().startswith(_text(right).casefold()),
+    PegaFunction.ENDS_WITH: lambda left, right: _text(left).casefold().endswith(_text(right).casefold()),
+    PegaFunction.GREATER_THAN: _numeric_test(gt),
+    PegaFunction.GREATER_THAN_OR_EQUAL: _numeric_test(ge),
+    PegaFunction.LESS_THAN: _numeric_test(lt),
+    PegaFunction.LESS_THAN_OR_EQUAL: _numeric_test(le),
+    PegaFunction.IS_TRUE: lambda left, right: left is True or _text(left).strip().lower() == "true",
+    PegaFunction.IS_FALSE: lambda left, right: left is False or _text(left).strip().lower() == "false",
+    PegaFunction.IS_BLANK: lambda left, right: not _text(left).strip(),
+    PegaFunction.IS_NOT_BLANK: lambda left, right: bool(_text(left).strip()),
+}
+
+
+def _compile_condition(cond: Condition, rules: Mapping[str, RulePredicate]) -> RulePredicate:
+    """Build the predicate for a single condition."""
+    if cond.condition_type == ConditionType.RULE_REFERENCE:
+        rule_name = cond.referenced_rule
+        expected = cond.rule_evaluates_to
+        return lambda record: rules[rule_name](record) == expected
+
+    func = cond.pega_function or _COMPARATOR_TO_FUNC.get(cond.comparator)
+    test = _FUNC_TESTS.get(func)
+    if test is None:
+        raise ValueError(
+            f"Cannot evaluate condition on {cond.property_reference!r}: "
+            f"unsupported comparator or function"
+        )
+
+    prop = cond.property_reference
+    trim = cond.apply_trim and func not in _NUMERIC_FUNCS
+
+    def property_value(record: Mapping[str, Any]) -> Any:
+        value = record.get(prop)
+        if trim and isinstance(value, str):
+            value = value.strip()
+        return value
+
+    if cond.compare_value_is_property:
+        other = cond.compare_value
+        return lambda record: test(property_value(record), record.get(other))
+
+    compare_value = cond.compare_value
+    if compare_value and len(compare_value) > 1 and compare_value[0] == compare_value[-1] == '"':
+        compare_value = compare_value[1:-1]
+    return lambda record: test(property_value(record), compare_value)
+
+
+def _combine(predicates: list[RulePredicate], operator: LogicalOperator) -> RulePredicate:
+    """Join predicates with AND/OR, short-circuiting like the Pega expression."""
+    if len(predicates) == 1:
+        return predicates[0]
+    predicates = tuple(predicates)
+
+    if operator == LogicalOperator.AND:
+        def evaluate(record: Mapping[str, Any]) -> bool:
+            for predicate in predicates:
+                if not predicate(record):
+                    return False
+            return True
+    else:
+        def evaluate(record: Mapping[str, Any]) -> bool:
+            for predicate in predicates:
+                if predicate(record):
+                    return True
+            return False
+    return evaluate
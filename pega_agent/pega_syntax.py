@@ -5,6 +5,7 @@ including functions like @equalsIgnoreCase, @greaterThan, @trim, etc.
 """
 
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 from dataclasses import dataclass
 
@@ -48,13 +49,25 @@ class PegaFunction(str, Enum):
     IS_NOT_BLANK = "@isNotBlank"
 
 
+# Expression text of each function, as written by FunctionCall and Condition
+_FUNC_NAME: dict[PegaFunction, str] = {func: func.value for func in PegaFunction}
+
+# Functions that take only the property as argument
+_UNARY_FUNCS = frozenset({
+    PegaFunction.IS_TRUE,
+    PegaFunction.IS_FALSE,
+    PegaFunction.IS_BLANK,
+    PegaFunction.IS_NOT_BLANK,
+})
+
+
 class LogicalOperator(str, Enum):
     """Logical operators for combining conditions."""
     AND = "&&"
     OR = "||"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RuleReference:
     """Reference to another When Rule."""
     rule_name: str
@@ -66,7 +79,7 @@ class RuleReference:
         return f"{{Rule {self.rule_name} evaluates to {eval_str}}}"
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionCall:
     """A Pega function call in an expression."""
     function: PegaFunction
@@ -75,10 +88,10 @@ class FunctionCall:
     def to_expression(self) -> str:
         """Convert to Pega expression format."""
         args_str = ", ".join(self.arguments)
-        return f"{self.function.value}({args_str})"
+        return f"{_FUNC_NAME[self.function]}({args_str})"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Condition:
     """A condition in a Pega When Rule expression.
 
@@ -86,6 +99,9 @@ class Condition:
     - A function call comparison (e.g., @equalsIgnoreCase(@trim(PROP), "value"))
     - A simple comparison (e.g., AGE_NUM < 18)
     - A rule reference (e.g., {Rule IsValidRPQ evaluates to true})
+
+    Conditions are immutable; the build_* helpers share one instance per
+    distinct condition through make_condition().
     """
     # For function-based conditions
     function: Optional[PegaFunction] = None
@@ -108,27 +124,28 @@ class Condition:
             # Simple comparison like AGE_NUM < 18
             return f"({self.property_ref} {self.simple_operator} {self.compare_value})"
 
-        if self.function:
+        function = self.function
+        if function:
             # Function-based comparison
+            name = _FUNC_NAME[function]
             prop = self.property_ref
             if self.apply_trim:
-                prop = f"@trim({self.property_ref})"
+                prop = f"@trim({prop})"
 
-            if self.function in (PegaFunction.IS_TRUE, PegaFunction.IS_FALSE,
-                                 PegaFunction.IS_BLANK, PegaFunction.IS_NOT_BLANK):
-                return f"{self.function.value}({prop})"
+            if function in _UNARY_FUNCS:
+                return f"{name}({prop})"
 
             # Quote string values
             val = self.compare_value
             if val and not val.startswith('"') and not val.isdigit():
                 val = f'"{val}"'
 
-            return f"{self.function.value}({prop}, {val})"
+            return f"{name}({prop}, {val})"
 
         return ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ConditionGroup:
     """A group of conditions combined with a logical operator."""
     conditions: list[Condition]
@@ -148,6 +165,26 @@ class ConditionGroup:
         return f"({op.join(exprs)})"
 
 
+@lru_cache(maxsize=4096)
+def make_condition(
+    function: Optional[PegaFunction] = None,
+    property_ref: Optional[str] = None,
+    compare_value: Optional[str] = None,
+    apply_trim: bool = False,
+    simple_operator: Optional[str] = None,
+    rule_reference: Optional[RuleReference] = None,
+) -> Condition:
+    """Get the shared Condition for the given fields, creating it on first use."""
+    return Condition(
+        function=function,
+        property_ref=property_ref,
+        compare_value=compare_value,
+        apply_trim=apply_trim,
+        simple_operator=simple_operator,
+        rule_reference=rule_reference,
+    )
+
+
 def build_string_comparison(
     property_ref: str,
     value: str,
@@ -172,7 +209,7 @@ def build_string_comparison(
     else:
         func = PegaFunction.NOT_EQUALS if negate else PegaFunction.EQUALS
 
-    return Condition(
+    return make_condition(
         function=func,
         property_ref=property_ref,
         compare_value=value,
@@ -203,7 +240,7 @@ def build_numeric_comparison(
     }
 
     if operator in func_map:
-        return Condition(
+        return make_condition(
             function=func_map[operator],
             property_ref=property_ref,
             compare_value=value,
@@ -211,7 +248,7 @@ def build_numeric_comparison(
         )
     else:
         # Use simple comparison syntax
-        return Condition(
+        return make_condition(
             property_ref=property_ref,
             compare_value=value,
             simple_operator=operator
@@ -228,7 +265,7 @@ def build_rule_reference(rule_name: str, evaluates_to: bool = True) -> Condition
     Returns:
         A Condition object
     """
-    return Condition(
+    return make_condition(
         rule_reference=RuleReference(rule_name=rule_name, evaluates_to=evaluates_to)
     )
 
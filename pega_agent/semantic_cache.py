@@ -0,0 +1,101 @@
+"""Embedding-similarity cache for agent responses.
+
+Campaign targeting requests are highly repetitive, so a query whose embedding
+is close enough to a previously answered one can reuse that answer instead of
+invoking the model again.
+"""
+
+import json
+import math
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+class SemanticCache:
+    """Ring buffer of (query embedding, numbers, response) entries.
+
+    Lookups return the response of the most similar cached query when its
+    cosine similarity is at least ``threshold``. Queries that differ only in a
+    number (a campaign ID, an age limit) embed almost identically, so an entry
+    is only eligible when the numbers in both queries match exactly.
+
+    With ``path`` set, entries are loaded from that JSON file and written back
+    on every change, so they outlive the process.
+    """
+
+    def __init__(self, threshold: float = 0.92, maxsize: int = 512, path: Optional[Path] = None):
+        self.threshold = threshold
+        self.path = path
+        self._entries: deque[tuple[tuple[float, ...], tuple[str, ...], str]] = deque(maxlen=maxsize)
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str, embedding: list[float]) -> Optional[str]:
+        """Return the cached response for the closest matching query, if any."""
+        vector = _normalize(embedding)
+        if vector is None:
+            return None
+
+        numbers = _numbers(query)
+        best_score = self.threshold
+        best_response = None
+        for cached_vector, cached_numbers, response in self._entries:
+            if cached_numbers != numbers:
+                continue
+            score = sum(a * b for a, b in zip(vector, cached_vector))
+            if score >= best_score:
+                best_score = score
+                best_response = response
+        return best_response
+
+    def put(self, query: str, embedding: list[float], response: str) -> None:
+        """Cache a response; the oldest entry is evicted once full."""
+        vector = _normalize(embedding)
+        if vector is not None:
+            self._entries.append((vector, _numbers(query), response))
+            self._save()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._save()
+
+    def _load(self) -> None:
+        # A missing or unreadable file just means an empty cache
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for vector, numbers, response in entries:
+            self._entries.append((tuple(vector), tuple(numbers), response))
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write a sibling file and rename it so a reader never sees a partial file
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self._entries), f)
+        os.replace(tmp_path, self.path)
+
+
+def _numbers(query: str) -> tuple[str, ...]:
+    """Numeric tokens of a query, in order."""
+    return tuple(_NUMBER_RE.findall(query))
+
+
+def _normalize(embedding: list[float]) -> Optional[tuple[float, ...]]:
+    """Scale to unit length so cosine similarity reduces to a dot product."""
+    norm = math.sqrt(sum(x * x for x in embedding))
+    if not norm:
+        return None
+    return tuple(x / norm for x in embedding)
@@ -5,6 +5,7 @@ import pytest
 from pega_agent.agent import (
     create_when_rule,
     validate_when_rule,
+    validate_when_rules,
     list_comparators,
     get_example_rules,
 )
@@ -73,6 +74,53 @@ class TestCreateWhenRule:
         assert result["status"] == "success"
         assert "AND" in result["expression"]
 
+    def test_create_rule_with_lowercase_operator(self):
+        conditions_json = json.dumps({
+            "groups": [
+                {
+                    "conditions": [
+                        {"rule": "IsHKID"},
+                        {"rule": "IsMMOCustomers"}
+                    ],
+                    "operator": "or"
+                }
+            ]
+        })
+
+        result = create_when_rule(
+            rule_name="TestRule",
+            applies_to="Customer Eligibility",
+            description="Test",
+            conditions_json=conditions_json
+        )
+
+        assert result["status"] == "success"
+        assert " || " in result["expression"]
+
+    def test_create_rule_with_null_operator(self):
+        conditions_json = json.dumps({
+            "groups": [
+                {
+                    "conditions": [
+                        {"rule": "IsHKID"},
+                        {"rule": "IsMMOCustomers"}
+                    ],
+                    "operator": None
+                }
+            ],
+            "group_operator": None
+        })
+
+        result = create_when_rule(
+            rule_name="TestRule",
+            applies_to="Customer Eligibility",
+            description="Test",
+            conditions_json=conditions_json
+        )
+
+        assert result["status"] == "success"
+        assert " && " in result["expression"]
+
     def test_create_rule_with_invalid_json(self):
         result = create_when_rule(
             rule_name="TestRule",
@@ -106,6 +154,25 @@ class TestValidateWhenRule:
         assert any("dangling" in e.lower() for e in result["errors"])
 
 
+class TestValidateWhenRules:
+    def test_all_valid(self):
+        result = validate_when_rules([
+            "@greaterThan(AGE_NUM, 18)",
+            "{Rule IsHKID evaluates to true}",
+        ])
+        assert result["all_valid"] is True
+        assert len(result["results"]) == 2
+
+    def test_reports_each_expression(self):
+        result = validate_when_rules([
+            "@greaterThan(AGE_NUM, 18)",
+            "(@greaterThan(AGE_NUM, 18)",
+        ])
+        assert result["all_valid"] is False
+        assert result["results"][0]["valid"] is True
+        assert result["results"][1]["valid"] is False
+
+
 class TestListComparators:
     def test_returns_all_comparators(self):
         result = list_comparators()
@@ -124,3 +124,28 @@ class TestSuggestDataSource:
         assert "table" in result["recommendation"]
         assert "reason" in result["recommendation"]
         assert "class" in result["recommendation"]
+
+    def test_keywords_match_inside_words(self):
+        result = suggest_data_source("bonds maturing this week")
+        assert result["recommendation"]["table"] == "INVESTMENT"
+
+    def test_overlapping_keywords_all_match(self):
+        # "nba" overlaps the start of "balance"; both must still be found
+        result = suggest_data_source("unbalanced")
+        assert [s["table"] for s in result["suggestions"]] == ["AAR", "MAR"]
+        assert result["recommendation"]["table"] == "AAR"
+
+    def test_first_match_only_returns_same_recommendation(self):
+        for hint in ("bond maturity", "account balance", "customer tenure", "unrelated"):
+            full = suggest_data_source(hint)
+            first = suggest_data_source(hint, first_match_only=True)
+            assert first["recommendation"] == full["recommendation"]
+            assert first["suggestions"] == [first["recommendation"]]
+
+    def test_results_are_independent(self):
+        result = suggest_data_source("bond maturity")
+        result["suggestions"].append({"table": "MAR"})
+        result["recommendation"]["table"] = "CAR"
+
+        fresh = suggest_data_source("bond maturity")
+        assert [s["table"] for s in fresh["suggestions"]] == ["INVESTMENT"]
@@ -1,11 +1,15 @@
 """Tests for Pega When Rule models."""
 
+from xml.etree import ElementTree
+
 import pytest
+from pydantic import ValidationError
 from pega_agent.models import (
     WhenRule,
     Condition,
     ConditionGroup,
     Comparator,
+    ConditionType,
     LogicalOperator,
 )
 
@@ -28,56 +32,272 @@ class TestCondition:
         )
         assert cond.compare_value is None
 
+    def test_condition_is_immutable(self):
+        cond = Condition(
+            property_reference=".IsActive",
+            comparator=Comparator.IS_TRUE
+        )
+        with pytest.raises(ValidationError):
+            cond.property_reference = ".IsClosed"
+
+
+@pytest.fixture(scope="module")
+def is_adult_rule():
+    return WhenRule(
+        rule_name="IsAdult",
+        applies_to="MyApp-Data-Customer",
+        description="Customer is an adult",
+        condition_groups=[
+            ConditionGroup(
+                conditions=[
+                    Condition(
+                        property_reference=".Age",
+                        comparator=Comparator.GREATER_THAN_OR_EQUAL,
+                        compare_value="18"
+                    )
+                ]
+            )
+        ]
+    )
+
+
+@pytest.fixture(scope="module")
+def is_qualified_rule():
+    return WhenRule(
+        rule_name="IsQualified",
+        applies_to="MyApp-Data-Applicant",
+        description="Applicant is qualified",
+        condition_groups=[
+            ConditionGroup(
+                conditions=[
+                    Condition(
+                        property_reference=".Age",
+                        comparator=Comparator.GREATER_THAN,
+                        compare_value="21"
+                    ),
+                    Condition(
+                        property_reference=".HasLicense",
+                        comparator=Comparator.IS_TRUE
+                    )
+                ],
+                operator=LogicalOperator.AND
+            )
+        ]
+    )
+
+
+@pytest.fixture(scope="module")
+def is_vip_rule():
+    return WhenRule(
+        rule_name="IsVIP",
+        applies_to="MyApp-Data-Customer",
+        description="Customer is VIP",
+        condition_groups=[
+            ConditionGroup(
+                conditions=[
+                    Condition(
+                        property_reference=".TotalSpend",
+                        comparator=Comparator.GREATER_THAN,
+                        compare_value="10000"
+                    )
+                ]
+            ),
+            ConditionGroup(
+                conditions=[
+                    Condition(
+                        property_reference=".Tier",
+                        comparator=Comparator.EQUALS,
+                        compare_value="Platinum"
+                    )
+                ]
+            )
+        ],
+        group_operator=LogicalOperator.OR
+    )
+
+
+@pytest.fixture(scope="module")
+def is_active_rule():
+    return WhenRule(
+        rule_name="IsActive",
+        applies_to="MyApp-Data-Account",
+        description="Account is active",
+        condition_groups=[
+            ConditionGroup(
+                conditions=[
+                    Condition(
+                        property_reference=".Status",
+                        comparator=Comparator.EQUALS,
+                        compare_value="Active"
+                    )
+                ]
+            )
+        ]
+    )
+
+
+@pytest.fixture(scope="module")
+def sample_rule():
+    return WhenRule(
+        rule_name="TestRule",
+        applies_to="MyApp-Data-Test",
+        description="Test rule",
+        condition_groups=[
+            ConditionGroup(
+                conditions=[
+                    Condition(
+                        property_reference=".Value",
+                        comparator=Comparator.EQUALS,
+                        compare_value="test"
+                    )
+                ]
+            )
+        ]
+    )
+
+
+# (rule fixture, [(check, expected)]) where check is "==" for the whole
+# expression or "in" for a substring of it.
+EXPRESSION_CASES = [
+    pytest.param(
+        "is_adult_rule",
+        [("==", ".Age is greater than or equal to 18")],
+        id="simple",
+    ),
+    pytest.param(
+        "is_qualified_rule",
+        [("in", ".Age is greater than 21"), ("in", ".HasLicense is true"), ("in", "AND")],
+        id="and_conditions",
+    ),
+    pytest.param(
+        "is_vip_rule",
+        [("in", "OR")],
+        id="or_groups",
+    ),
+]
+
+
+EXPECTED_DICT_KEYS = frozenset({"pxObjClass", "pyClassName", "pyRuleName", "pyConditions"})
+
 
 class TestWhenRule:
-    def test_simple_when_rule_expression(self):
+    @pytest.mark.parametrize("rule_fixture,checks", EXPRESSION_CASES)
+    def test_to_expression(self, request, rule_fixture, checks):
+        expr = request.getfixturevalue(rule_fixture).to_expression()
+        for check, expected in checks:
+            if check == "==":
+                assert expr == expected
+            else:
+                assert expected in expr
+
+    def test_to_expression_many(self):
+        adult = Condition(
+            property_reference=".Age",
+            comparator=Comparator.GREATER_THAN_OR_EQUAL,
+            compare_value="18"
+        )
+        rules = [
+            WhenRule(
+                rule_name="IsAdult",
+                applies_to="MyApp-Data-Customer",
+                description="Customer is an adult",
+                condition_groups=[ConditionGroup(conditions=[adult])]
+            ),
+            WhenRule(
+                rule_name="IsActiveAdult",
+                applies_to="MyApp-Data-Customer",
+                description="Customer is an active adult",
+                condition_groups=[
+                    ConditionGroup(
+                        conditions=[
+                            adult,
+                            Condition(
+                                property_reference=".IsActive",
+                                comparator=Comparator.IS_TRUE
+                            )
+                        ]
+                    )
+                ]
+            ),
+        ]
+        for use_pega_functions in (True, False):
+            assert WhenRule.to_expression_many(rules, use_pega_functions) == [
+                rule.to_expression(use_pega_functions) for rule in rules
+            ]
+
+    def test_to_pega_xml(self, is_active_rule):
+        root = ElementTree.fromstring(is_active_rule.to_pega_xml())
+        assert root.findtext(".//ruleName") == "IsActive"
+        assert root.findtext(".//appliesTo") == "MyApp-Data-Account"
+        assert root.findtext(".//propertyRef") == ".Status"
+
+    def test_to_pega_xml_escapes_values(self):
         when_rule = WhenRule(
-            rule_name="IsAdult",
-            applies_to="MyApp-Data-Customer",
-            description="Customer is an adult",
+            rule_name="IsMortgage",
+            applies_to="MyApp-Data-Account",
+            description="Home & property <secured> loans",
             condition_groups=[
                 ConditionGroup(
                     conditions=[
                         Condition(
-                            property_reference=".Age",
-                            comparator=Comparator.GREATER_THAN_OR_EQUAL,
-                            compare_value="18"
-                        )
+                            property_reference=".ProductType",
+                            comparator=Comparator.EQUALS,
+                            compare_value="M&A"
+                        ),
+                        Condition(
+                            property_reference=".Status",
+                            comparator=Comparator.EQUALS,
+                            compare_value="Active"
+                        ),
                     ]
                 )
             ]
         )
-        assert when_rule.to_expression() == '.Age is greater than or equal to 18'
+        root = ElementTree.fromstring(when_rule.to_pega_xml())
+        assert root.findtext("description") == "Home & property <secured> loans"
+        assert root.findtext("conditions/condition/compareValue") == "M&A"
+        assert root.findtext("conditions/operator") == "&&"
 
-    def test_and_conditions(self):
+    def test_to_dict(self, sample_rule):
+        d = sample_rule.to_dict()
+        assert EXPECTED_DICT_KEYS <= d.keys()
+        assert (d["pxObjClass"], d["pyClassName"], d["pyRuleName"], len(d["pyConditions"])) == (
+            "Rule-Obj-When", "MyApp-Data-Test", "TestRule", 1
+        )
+
+
+class TestCompile:
+    def test_numeric_and_string_conditions(self):
         when_rule = WhenRule(
-            rule_name="IsQualified",
-            applies_to="MyApp-Data-Applicant",
-            description="Applicant is qualified",
+            rule_name="IsAdultInHK",
+            applies_to="MyApp-Data-Customer",
+            description="Adult customer resident in HK",
             condition_groups=[
                 ConditionGroup(
                     conditions=[
                         Condition(
-                            property_reference=".Age",
-                            comparator=Comparator.GREATER_THAN,
-                            compare_value="21"
+                            property_reference="AGE_NUM",
+                            comparator=Comparator.GREATER_THAN_OR_EQUAL,
+                            compare_value="18",
+                            apply_trim=False
                         ),
                         Condition(
-                            property_reference=".HasLicense",
-                            comparator=Comparator.IS_TRUE
+                            property_reference="CUST_CTRY_RELN_CDE10",
+                            comparator=Comparator.EQUALS,
+                            compare_value="HK"
                         )
-                    ],
-                    operator=LogicalOperator.AND
+                    ]
                 )
             ]
         )
-        expr = when_rule.to_expression()
-        assert ".Age is greater than 21" in expr
-        assert ".HasLicense is true" in expr
-        assert "AND" in expr
+        is_adult_in_hk = when_rule.compile()
+        assert is_adult_in_hk({"AGE_NUM": "30", "CUST_CTRY_RELN_CDE10": " hk "})
+        assert not is_adult_in_hk({"AGE_NUM": 17, "CUST_CTRY_RELN_CDE10": "HK"})
+        assert not is_adult_in_hk({"CUST_CTRY_RELN_CDE10": "HK"})
 
-    def test_or_groups(self):
-        when_rule = WhenRule(
+    def test_or_groups_and_rule_references(self):
+        rules = {}
+        rules["IsVIP"] = WhenRule(
             rule_name="IsVIP",
             applies_to="MyApp-Data-Customer",
             description="Customer is VIP",
@@ -85,80 +305,106 @@ class TestWhenRule:
                 ConditionGroup(
                     conditions=[
                         Condition(
-                            property_reference=".TotalSpend",
-                            comparator=Comparator.GREATER_THAN,
-                            compare_value="10000"
+                            property_reference=".Tier",
+                            comparator=Comparator.EQUALS,
+                            compare_value="Platinum"
+                        )
+                    ]
+                )
+            ]
+        ).compile(rules)
+        is_not_vip_or_blank = WhenRule(
+            rule_name="IsNotVIPOrBlank",
+            applies_to="MyApp-Data-Customer",
+            description="Customer is not VIP or has no segment",
+            condition_groups=[
+                ConditionGroup(
+                    conditions=[
+                        Condition(
+                            condition_type=ConditionType.RULE_REFERENCE,
+                            referenced_rule="IsVIP",
+                            rule_evaluates_to=False
                         )
                     ]
                 ),
                 ConditionGroup(
                     conditions=[
                         Condition(
-                            property_reference=".Tier",
-                            comparator=Comparator.EQUALS,
-                            compare_value="Platinum"
+                            property_reference=".Segment",
+                            comparator=Comparator.IS_BLANK
                         )
                     ]
                 )
             ],
             group_operator=LogicalOperator.OR
-        )
-        expr = when_rule.to_expression()
-        assert "OR" in expr
+        ).compile(rules)
+        assert is_not_vip_or_blank({".Tier": "Gold", ".Segment": "Premier"})
+        assert is_not_vip_or_blank({".Tier": "platinum", ".Segment": " "})
+        assert not is_not_vip_or_blank({".Tier": "Platinum", ".Segment": "Premier"})
 
-    def test_to_pega_xml(self):
+    def test_string_matches_ignore_case(self):
         when_rule = WhenRule(
-            rule_name="IsActive",
-            applies_to="MyApp-Data-Account",
-            description="Account is active",
+            rule_name="IsPremierSegment",
+            applies_to="MyApp-Data-Customer",
+            description="Segment mentions Premier",
             condition_groups=[
                 ConditionGroup(
                     conditions=[
                         Condition(
-                            property_reference=".Status",
-                            comparator=Comparator.EQUALS,
-                            compare_value="Active"
+                            property_reference=".Segment",
+                            comparator=Comparator.CONTAINS,
+                            compare_value="Premier"
+                        ),
+                        Condition(
+                            property_reference=".Segment",
+                            comparator=Comparator.STARTS_WITH,
+                            compare_value="HSBC"
                         )
                     ]
                 )
             ]
         )
-        xml = when_rule.to_pega_xml()
-        assert "<ruleName>IsActive</ruleName>" in xml
-        assert "<appliesTo>MyApp-Data-Account</appliesTo>" in xml
-        assert "<propertyRef>.Status</propertyRef>" in xml
+        is_premier = when_rule.compile()
+        assert is_premier({".Segment": "hsbc PREMIER Elite"})
+        assert not is_premier({".Segment": "hsbc Advance"})
 
-    def test_to_dict(self):
+    def test_unsupported_comparator(self):
         when_rule = WhenRule(
-            rule_name="TestRule",
-            applies_to="MyApp-Data-Test",
-            description="Test rule",
+            rule_name="IsInList",
+            applies_to="MyApp-Data-Customer",
+            description="Tier is in list",
             condition_groups=[
                 ConditionGroup(
                     conditions=[
                         Condition(
-                            property_reference=".Value",
-                            comparator=Comparator.EQUALS,
-                            compare_value="test"
+                            property_reference=".Tier",
+                            comparator=Comparator.IS_IN,
+                            compare_value="Gold,Platinum"
                         )
                     ]
                 )
             ]
         )
-        d = when_rule.to_dict()
-        assert d["pxObjClass"] == "Rule-Obj-When"
-        assert d["pyClassName"] == "MyApp-Data-Test"
-        assert d["pyRuleName"] == "TestRule"
-        assert len(d["pyConditions"]) == 1
+        with pytest.raises(ValueError):
+            when_rule.compile()
+
+
+EXPECTED_COMPARATOR_VALUES = {
+    Comparator.EQUALS: "is equal to",
+    Comparator.GREATER_THAN: "is greater than",
+    Comparator.CONTAINS: "contains",
+}
 
 
 class TestComparator:
-    def test_all_comparators_have_values(self):
-        for comp in Comparator:
-            assert comp.value is not None
-            assert len(comp.value) > 0
-
-    def test_comparator_values(self):
-        assert Comparator.EQUALS.value == "is equal to"
-        assert Comparator.GREATER_THAN.value == "is greater than"
-        assert Comparator.CONTAINS.value == "contains"
+    @pytest.mark.parametrize("comp", list(Comparator), ids=lambda c: c.name)
+    def test_comparator_value(self, comp):
+        value = comp.value
+        assert value
+        assert EXPECTED_COMPARATOR_VALUES.get(comp, value) == value
+
+    def test_is_numeric(self):
+        assert Comparator.GREATER_THAN.is_numeric
+        assert Comparator.LESS_THAN_OR_EQUAL.is_numeric
+        assert not Comparator.EQUALS.is_numeric
+        assert not Comparator.IS_TRUE.is_numeric
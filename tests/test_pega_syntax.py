@@ -0,0 +1,24 @@
+"""Tests for Pega expression syntax helpers."""
+
+from dataclasses import FrozenInstanceError
+
+import pytest
+from pega_agent.pega_syntax import (
+    build_numeric_comparison,
+    build_rule_reference,
+    build_string_comparison,
+)
+
+
+class TestConditionBuilders:
+    def test_builders_share_conditions(self):
+        cond = build_string_comparison(".Status", "Active")
+        assert build_string_comparison(".Status", "Active") is cond
+        assert build_numeric_comparison(".Age", "18", ">=") is build_numeric_comparison(".Age", "18", ">=")
+        assert build_rule_reference("IsValidRPQ") is build_rule_reference("IsValidRPQ")
+        assert build_rule_reference("IsValidRPQ", False) is not build_rule_reference("IsValidRPQ")
+
+    def test_conditions_are_immutable(self):
+        cond = build_string_comparison(".Status", "Active")
+        with pytest.raises(FrozenInstanceError):
+            cond.compare_value = "Closed"
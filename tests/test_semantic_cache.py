@@ -0,0 +1,63 @@
+"""Tests for the semantic response cache."""
+
+from pega_agent.semantic_cache import SemanticCache
+
+
+class TestSemanticCache:
+    def test_hit_on_similar_embedding(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.put("bond maturity rule", [1.0, 0.0, 0.0], "bond maturity rule")
+
+        assert cache.get("bond maturity when rule", [0.99, 0.05, 0.0]) == "bond maturity rule"
+
+    def test_miss_below_threshold(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.put("bond maturity rule", [1.0, 0.0, 0.0], "bond maturity rule")
+
+        assert cache.get("bond maturity rule", [0.0, 1.0, 0.0]) is None
+
+    def test_miss_when_numbers_differ(self):
+        cache = SemanticCache(threshold=0.9)
+        cache.put("Standard exclusion for campaign 12345", [1.0, 0.0, 0.0], "campaign 12345")
+
+        assert cache.get("Standard exclusion for campaign 12346", [1.0, 0.0, 0.0]) is None
+        assert cache.get("Standard exclusion for campaign 12345", [1.0, 0.0, 0.0]) == "campaign 12345"
+
+    def test_returns_closest_match(self):
+        cache = SemanticCache(threshold=0.5)
+        cache.put("rule", [1.0, 1.0, 0.0], "near")
+        cache.put("rule", [1.0, 0.0, 0.0], "exact")
+
+        assert cache.get("rule", [2.0, 0.0, 0.0]) == "exact"
+
+    def test_evicts_oldest_when_full(self):
+        cache = SemanticCache(threshold=0.99, maxsize=2)
+        cache.put("rule", [1.0, 0.0, 0.0], "first")
+        cache.put("rule", [0.0, 1.0, 0.0], "second")
+        cache.put("rule", [0.0, 0.0, 1.0], "third")
+
+        assert len(cache) == 2
+        assert cache.get("rule", [1.0, 0.0, 0.0]) is None
+        assert cache.get("rule", [0.0, 0.0, 1.0]) == "third"
+
+    def test_zero_vector_is_ignored(self):
+        cache = SemanticCache()
+        cache.put("rule", [0.0, 0.0], "nothing")
+
+        assert len(cache) == 0
+        assert cache.get("rule", [0.0, 0.0]) is None
+
+    def test_persists_to_path(self, tmp_path):
+        path = tmp_path / "cache" / "semantic_cache.json"
+        cache = SemanticCache(threshold=0.9, path=path)
+        cache.put("campaign 47817", [1.0, 0.0, 0.0], "bond maturity rule")
+
+        reloaded = SemanticCache(threshold=0.9, path=path)
+        assert len(reloaded) == 1
+        assert reloaded.get("campaign 47817", [1.0, 0.0, 0.0]) == "bond maturity rule"
+
+    def test_unreadable_path_starts_empty(self, tmp_path):
+        path = tmp_path / "semantic_cache.json"
+        path.write_text("not json")
+
+        assert len(SemanticCache(path=path)) == 0